@@ -1,27 +1,76 @@
+import importlib.util
 import os
 import typing
-from elevenlabs import ElevenLabs, ConversationalConfig
-from elevenlabs.types import AgentPlatformSettingsRequestModel
-from elevenlabs.client import OMIT
 
+# The SDK pulls in httpx and every pydantic model at import time (about a second),
+# so it is only imported once a command actually talks to the API.
+if typing.TYPE_CHECKING:
+    import httpx
+    from elevenlabs import ElevenLabs
 
-def get_elevenlabs_client() -> ElevenLabs:
+
+def __getattr__(name: str) -> typing.Any:
+    # Keeps `from elevenlabsapi import OMIT` working without an eager SDK import
+    if name == "OMIT":
+        from elevenlabs.client import OMIT
+        return OMIT
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Client shared by every call in this process so the underlying httpx connection
+# pool (and its keep-alive connections) survives across syncs and watch ticks.
+_client: typing.Optional["ElevenLabs"] = None
+_client_api_key: typing.Optional[str] = None
+
+# Whether .env has been loaded into the environment yet; only commands that talk to the API need it
+_dotenv_loaded = False
+
+
+def _http2_client() -> typing.Optional["httpx.Client"]:
+    """
+    Returns an HTTP/2 httpx client when the optional h2 package is installed, otherwise None.
+
+    Over HTTP/2 the concurrent requests made by sync are multiplexed over a single
+    connection instead of each opening its own. No timeout is set here: the ElevenLabs
+    client passes its own (60 seconds by default) with every request.
+    """
+    if importlib.util.find_spec("h2") is None:
+        return None
+    import httpx
+    return httpx.Client(http2=True, follow_redirects=True)
+
+
+def get_elevenlabs_client() -> "ElevenLabs":
     """
     Retrieves the ElevenLabs API key from environment variables and returns an API client.
 
+    A .env file is loaded into the environment on the first call. The client is
+    created once and reused for as long as the API key stays the same.
+
     Raises:
         ValueError: If the ELEVENLABS_API_KEY environment variable is not set.
 
     Returns:
         An instance of the ElevenLabs client.
     """
+    global _client, _client_api_key, _dotenv_loaded
+
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
     api_key = os.getenv("ELEVENLABS_API_KEY")
     if not api_key:
         raise ValueError("ELEVENLABS_API_KEY environment variable not set.")
-    return ElevenLabs(api_key=api_key)
+    if _client is None or _client_api_key != api_key:
+        from elevenlabs import ElevenLabs
+        _client = ElevenLabs(api_key=api_key, httpx_client=_http2_client())
+        _client_api_key = api_key
+    return _client
 
 def create_agent_api(
-    client: ElevenLabs,
+    client: "ElevenLabs",
     name: str,
     conversation_config_dict: dict,
     platform_settings_dict: typing.Optional[dict] = None,
@@ -40,6 +89,10 @@ def create_agent_api(
     Returns:
         The agent_id of the newly created agent.
     """
+    from elevenlabs import ConversationalConfig
+    from elevenlabs.client import OMIT
+    from elevenlabs.types import AgentPlatformSettingsRequestModel
+
     conv_config = ConversationalConfig(**conversation_config_dict)
     plat_settings_arg = OMIT
     if platform_settings_dict is not None:
@@ -58,7 +111,7 @@ def create_agent_api(
     return response.agent_id
 
 def update_agent_api(
-    client: ElevenLabs,
+    client: "ElevenLabs",
     agent_id: str,
     name: typing.Optional[str] = None,
     conversation_config_dict: typing.Optional[dict] = None,
@@ -72,23 +125,28 @@ def update_agent_api(
         client: An initialized ElevenLabs client.
         agent_id: The ID of the agent to update.
         name: Optional new name for the agent.
-        conversation_config_dict: Optional new dictionary for ConversationalConfig.
-        platform_settings_dict: Optional new dictionary for AgentPlatformSettingsRequestModel.
+        conversation_config_dict: Optional new dictionary for ConversationalConfig (omitted when empty).
+        platform_settings_dict: Optional new dictionary for AgentPlatformSettingsRequestModel (omitted when empty).
         tags: Optional new list of tags.
 
     Returns:
         The agent_id of the updated agent.
     """
+    from elevenlabs import ConversationalConfig
+    from elevenlabs.client import OMIT
+    from elevenlabs.types import AgentPlatformSettingsRequestModel
+
     name_arg = OMIT
     if name is not None:
         name_arg = name
 
+    # Empty dicts would produce empty models that change nothing, so skip building them
     conv_config_arg = OMIT
-    if conversation_config_dict is not None:
+    if conversation_config_dict:
         conv_config_arg = ConversationalConfig(**conversation_config_dict)
 
     plat_settings_arg = OMIT
-    if platform_settings_dict is not None:
+    if platform_settings_dict:
         plat_settings_arg = AgentPlatformSettingsRequestModel(**platform_settings_dict)
 
     tags_arg = OMIT
@@ -105,22 +163,24 @@ def update_agent_api(
     return response.agent_id
 
 def list_agents_api(
-    client: ElevenLabs,
+    client: "ElevenLabs",
     page_size: int = 30,
     search: typing.Optional[str] = None
-) -> typing.List[dict]:
+) -> typing.Iterator[dict]:
     """
     Lists all agents from the ElevenLabs API.
 
+    Pages are requested lazily, so agents from the first page are available
+    before later pages have been fetched.
+
     Args:
         client: An initialized ElevenLabs client.
         page_size: Maximum number of agents to return per page (default: 30, max: 100).
         search: Optional search string to filter agents by name.
 
-    Returns:
-        A list of agent metadata dictionaries.
+    Yields:
+        Agent metadata dictionaries.
     """
-    all_agents = []
     cursor = None
     
     while True:
@@ -133,16 +193,15 @@ def list_agents_api(
             
         response = client.conversational_ai.agents.list(**kwargs)
         
-        all_agents.extend(response.agents)
+        for agent in response.agents:
+            yield agent.dict()
         
         if not response.has_more:
             break
             
         cursor = response.next_cursor
-    
-    return [agent.dict() for agent in all_agents]
 
-def get_agent_api(client: ElevenLabs, agent_id: str) -> dict:
+def get_agent_api(client: "ElevenLabs", agent_id: str) -> dict:
     """
     Gets detailed configuration for a specific agent from the ElevenLabs API.
 
@@ -1,11 +1,11 @@
 import json
+import os
+import typing
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from dotenv import load_dotenv
 
 import typer
 
-load_dotenv()
-
 from . import utils
 from . import elevenlabsapi
 from . import templates
@@ -16,6 +16,227 @@ app = typer.Typer(help="ElevenLabs Conversational AI Agent Manager CLI")
 AGENTS_CONFIG_FILE = "agents.json"
 LOCK_FILE = "convai.lock"
 
+# Relative to the current working directory, like the file names above
+AGENTS_CONFIG_PATH = Path(AGENTS_CONFIG_FILE)
+LOCK_PATH = Path(LOCK_FILE)
+
+# Maximum number of concurrent ElevenLabs API requests made by sync and fetch
+SYNC_MAX_WORKERS = 8
+
+# Maps characters in agent names to their replacements when building config file names
+_SAFE_NAME_TABLE = str.maketrans({" ": "_", "[": None, "]": None})
+
+# Quiet period used by watch to coalesce bursts of filesystem events into one sync
+WATCH_DEBOUNCE_SECONDS = 0.2
+
+
+def _safe_name(name: str) -> str:
+    """Turn an agent name into the base name of its config file."""
+    return name.lower().translate(_SAFE_NAME_TABLE)
+
+
+def _with_environment_tag(tags: list, environment: str) -> list:
+    """Return tags with the environment tag added, reusing the same list when nothing needs adding."""
+    if not environment or environment in tags:
+        return tags
+    return [*tags, environment]
+
+
+def _push_agent(client, agent_name: str, agent_config: dict, environment: str, agent_id: str = None) -> str:
+    """
+    Creates or updates the ElevenLabs agent for one environment of a local agent config.
+
+    Returns the agent ID (newly created when agent_id is not given).
+    """
+    # Extract config components
+    conversation_config = agent_config.get("conversation_config", {})
+    platform_settings = agent_config.get("platform_settings")
+    # Add environment tag if specified and not already present
+    tags = _with_environment_tag(agent_config.get("tags", []), environment)
+    
+    # Use name from config or default to agent definition name
+    agent_display_name = agent_config.get("name", agent_name)
+    
+    if not agent_id:
+        # Create new agent for this environment
+        return elevenlabsapi.create_agent_api(
+            client=client,
+            name=agent_display_name,
+            conversation_config_dict=conversation_config,
+            platform_settings_dict=platform_settings,
+            tags=tags
+        )
+    
+    # Update existing environment-specific agent
+    elevenlabsapi.update_agent_api(
+        client=client,
+        agent_id=agent_id,
+        name=agent_display_name,
+        conversation_config_dict=conversation_config,
+        platform_settings_dict=platform_settings,
+        tags=tags
+    )
+    return agent_id
+
+
+def _sync_environments(client, agents_to_process: list, lock_data: dict, environments_to_sync: list, dry_run: bool = False) -> bool:
+    """
+    Creates or updates the agents whose config hash differs from the lock file, for each given environment.
+
+    Updates lock_data in place (the caller saves it) and returns True if any agent was created or updated.
+    """
+    changes_made = False
+    pending_updates = []
+    
+    for current_env in environments_to_sync:
+        typer.echo(f"\n📍 Processing environment: {current_env}")
+        
+        for agent_def in agents_to_process:
+            agent_name = agent_def["name"]
+            
+            # Handle both old and new config structure
+            config_path = None
+            if "environments" in agent_def:
+                # New structure - get config for specific environment
+                if current_env in agent_def["environments"]:
+                    config_path = agent_def["environments"][current_env]["config"]
+                else:
+                    typer.echo(f"⚠️  Agent '{agent_name}' not configured for environment '{current_env}'")
+                    continue
+            else:
+                # Old structure - backward compatibility
+                config_path = agent_def.get("config")
+                if not config_path:
+                    typer.echo(f"⚠️  No config path found for agent '{agent_name}'")
+                    continue
+            
+            # Check if config file exists
+            try:
+                config_stat = os.stat(config_path)
+            except OSError:
+                typer.echo(f"⚠️  Config file not found for {agent_name}: {config_path}")
+                continue
+            config_mtime_ns, config_size = config_stat.st_mtime_ns, config_stat.st_size
+            
+            # Get environment-specific agent data from lock file
+            locked_agent = utils.get_agent_from_lock(lock_data, agent_name, current_env)
+            
+            # Config file untouched since it was last pushed, so its hash cannot have changed.
+            # The size is compared too, since coarse timestamps can miss an edit made within
+            # the same tick as the last sync.
+            if (locked_agent and locked_agent.get("hash")
+                    and locked_agent.get("mtime_ns") == config_mtime_ns
+                    and locked_agent.get("size") == config_size):
+                typer.echo(f"✅ {agent_name}: No changes (environment: {current_env})")
+                continue
+            
+            # Read the file once; the hashes, mtime_ns and size recorded in the lock file
+            # all come from these bytes, so an edit made meanwhile cannot be mixed in
+            try:
+                config_bytes, file_hash, config_mtime_ns, config_size = utils.read_config_file_with_hash(config_path)
+            except Exception as e:
+                typer.echo(f"❌ Error reading config for {agent_name}: {e}")
+                continue
+            
+            # Same bytes as last pushed (e.g. only the mtime changed), so there is no need to parse them
+            if locked_agent and locked_agent.get("hash") and locked_agent.get("file_hash") == file_hash:
+                typer.echo(f"✅ {agent_name}: No changes (environment: {current_env})")
+                continue
+            
+            # Load agent config and its hash
+            try:
+                agent_config, config_hash = utils.parse_agent_config_with_hash(config_path, config_bytes)
+            except Exception as e:
+                typer.echo(f"❌ Error reading config for {agent_name}: {e}")
+                continue
+            
+            needs_update = True
+            
+            if locked_agent:
+                if locked_agent.get("hash") == config_hash:
+                    needs_update = False
+                    typer.echo(f"✅ {agent_name}: No changes (environment: {current_env})")
+                else:
+                    typer.echo(f"🔄 {agent_name}: Config changed, will update (environment: {current_env})")
+            else:
+                typer.echo(f"🆕 {agent_name}: New environment detected, will create/update (environment: {current_env})")
+            
+            if not needs_update:
+                continue
+            
+            if dry_run:
+                typer.echo(f"[DRY RUN] Would update agent: {agent_name} (environment: {current_env})")
+                continue
+            
+            # Get environment-specific agent ID from lock file
+            agent_id = locked_agent.get("id") if locked_agent else None
+            pending_updates.append((agent_name, current_env, agent_id, agent_config, config_hash, config_mtime_ns, config_size, file_hash))
+    
+    # Perform API operations concurrently; each agent/environment pair is an independent request
+    if pending_updates:
+        executor = ThreadPoolExecutor(max_workers=min(SYNC_MAX_WORKERS, len(pending_updates)))
+        futures = {}
+        try:
+            for agent_name, current_env, agent_id, agent_config, config_hash, config_mtime_ns, config_size, file_hash in pending_updates:
+                future = executor.submit(_push_agent, client, agent_name, agent_config, current_env, agent_id)
+                futures[future] = (agent_name, current_env, agent_id, config_hash, config_mtime_ns, config_size, file_hash)
+            
+            # Results are handled here on the main thread, so lock_data needs no extra locking
+            for future in as_completed(futures):
+                agent_name, current_env, existing_agent_id, config_hash, config_mtime_ns, config_size, file_hash = futures[future]
+                try:
+                    agent_id = future.result()
+                except Exception as e:
+                    typer.echo(f"❌ Error processing {agent_name}: {e}")
+                    continue
+                
+                if existing_agent_id:
+                    typer.echo(f"✅ Updated agent {agent_name} for environment '{current_env}' (ID: {agent_id})")
+                else:
+                    typer.echo(f"✅ Created agent {agent_name} for environment '{current_env}' (ID: {agent_id})")
+                
+                # Update lock file with environment-specific data
+                utils.update_agent_in_lock(
+                    lock_data, agent_name, current_env, agent_id, config_hash,
+                    mtime_ns=config_mtime_ns, file_hash=file_hash, size=config_size
+                )
+                changes_made = True
+        except KeyboardInterrupt:
+            # Stop without waiting for the queued requests: cancel those that have not
+            # started (requests already in flight cannot be interrupted). lock_data keeps
+            # the agents pushed so far, for the caller to save.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+            raise
+        executor.shutdown()
+    
+    return changes_made
+
+
+def _do_sync(client, agents_to_process: list, environments_to_sync: list, dry_run: bool = False) -> bool:
+    """
+    Runs _sync_environments against the lock file, saving it afterwards if anything changed.
+
+    Shared by the sync and watch commands. Returns True if any agent was created or updated.
+    """
+    lock_data = utils.load_lock_file(str(LOCK_PATH))
+    
+    try:
+        changes_made = _sync_environments(client, agents_to_process, lock_data, environments_to_sync, dry_run)
+    except KeyboardInterrupt:
+        # Keep the IDs of agents created before the interrupt, so the next sync updates them
+        if not dry_run and utils.save_lock_file(str(LOCK_PATH), lock_data):
+            typer.echo("💾 Updated lock file")
+        raise
+    
+    # Save lock file if changes were made
+    if changes_made and not dry_run:
+        utils.save_lock_file(str(LOCK_PATH), lock_data)
+        typer.echo("💾 Updated lock file")
+    
+    return changes_made
+
 
 @app.command()
 def init(
@@ -40,7 +261,7 @@ def init(
     # Create lock file if it doesn't exist
     lock_file_path = project_path / LOCK_FILE
     if not lock_file_path.exists():
-        utils.save_lock_file(str(lock_file_path), {utils.LOCK_FILE_AGENTS_KEY: {}})
+        utils.save_lock_file(str(lock_file_path), utils.new_lock_data())
         typer.echo(f"Created {LOCK_FILE}")
     
     typer.echo(f"✅ Initialized agent management project in {project_path}")
@@ -57,7 +278,7 @@ def add(
     """Add a new agent - creates config, uploads to ElevenLabs, and saves ID."""
     
     # Check if agents.json exists
-    agents_config_path = Path(AGENTS_CONFIG_FILE)
+    agents_config_path = AGENTS_CONFIG_PATH
     if not agents_config_path.exists():
         typer.echo("❌ agents.json not found. Run 'convai init' first.", err=True)
         raise typer.Exit(1)
@@ -66,7 +287,7 @@ def add(
     agents_config = utils.read_agent_config(str(agents_config_path))
     
     # Load lock file to check environment-specific agents
-    lock_file_path = Path(LOCK_FILE)
+    lock_file_path = LOCK_PATH
     lock_data = utils.load_lock_file(str(lock_file_path))
     
     # Check if agent already exists for this specific environment
@@ -84,12 +305,11 @@ def add(
     
     # Generate environment-specific config path if not provided
     if not config_path:
-        safe_name = name.lower().replace(" ", "_").replace("[", "").replace("]", "")
+        safe_name = _safe_name(name)
         config_path = f"agent_configs/{environment}/{safe_name}.json"
     
-    # Create config directory and file
+    # Create config file (write_agent_config creates missing directories)
     config_file_path = Path(config_path)
-    config_file_path.parent.mkdir(parents=True, exist_ok=True)
     
     # Create agent config using template
     try:
@@ -148,11 +368,8 @@ def add(
         # Extract config components
         conversation_config = agent_config.get("conversation_config", {})
         platform_settings = agent_config.get("platform_settings")
-        tags = agent_config.get("tags", [])
-        
         # Add environment tag if specified and not already present
-        if environment and environment not in tags:
-            tags = tags + [environment]
+        tags = _with_environment_tag(agent_config.get("tags", []), environment)
         
         # Create new agent
         agent_id = elevenlabsapi.create_agent_api(
@@ -195,7 +412,7 @@ def add(
         utils.write_agent_config(str(agents_config_path), agents_config)
         
         # Update lock file with environment-specific agent ID
-        config_hash = utils.calculate_config_hash(agent_config)
+        config_hash = utils.calculate_agent_config_hash(agent_config)
         utils.update_agent_in_lock(lock_data, name, environment, agent_id, config_hash)
         utils.save_lock_file(str(lock_file_path), lock_data)
         
@@ -249,18 +466,15 @@ def sync(
     """Synchronize agents with ElevenLabs API when configs change."""
     
     # Load agents configuration
-    agents_config_path = Path(AGENTS_CONFIG_FILE)
+    agents_config_path = AGENTS_CONFIG_PATH
     if not agents_config_path.exists():
         typer.echo("❌ agents.json not found. Run 'init' first.", err=True)
         raise typer.Exit(1)
     
     agents_config = utils.read_agent_config(str(agents_config_path))
     
-    # Load lock file
-    lock_file_path = Path(LOCK_FILE)
-    lock_data = utils.load_lock_file(str(lock_file_path))
-    
     # Initialize ElevenLabs client
+    client = None
     if not dry_run:
         try:
             client = elevenlabsapi.get_elevenlabs_client()
@@ -297,116 +511,7 @@ def sync(
         
         typer.echo(f"🔄 Syncing all environments: {', '.join(environments_to_sync)}")
     
-    changes_made = False
-    
-    for current_env in environments_to_sync:
-        typer.echo(f"\n📍 Processing environment: {current_env}")
-        
-        for agent_def in agents_to_process:
-            agent_name = agent_def["name"]
-            
-            # Handle both old and new config structure
-            config_path = None
-            if "environments" in agent_def:
-                # New structure - get config for specific environment
-                if current_env in agent_def["environments"]:
-                    config_path = agent_def["environments"][current_env]["config"]
-                else:
-                    typer.echo(f"⚠️  Agent '{agent_name}' not configured for environment '{current_env}'")
-                    continue
-            else:
-                # Old structure - backward compatibility
-                config_path = agent_def.get("config")
-                if not config_path:
-                    typer.echo(f"⚠️  No config path found for agent '{agent_name}'")
-                    continue
-            
-            # Check if config file exists
-            if not Path(config_path).exists():
-                typer.echo(f"⚠️  Config file not found for {agent_name}: {config_path}")
-                continue
-            
-            # Load agent config
-            try:
-                agent_config = utils.read_agent_config(config_path)
-            except Exception as e:
-                typer.echo(f"❌ Error reading config for {agent_name}: {e}")
-                continue
-            
-            # Calculate config hash
-            config_hash = utils.calculate_config_hash(agent_config)
-            
-            # Get environment-specific agent data from lock file
-            locked_agent = utils.get_agent_from_lock(lock_data, agent_name, current_env)
-            
-            needs_update = True
-            
-            if locked_agent:
-                if locked_agent.get("hash") == config_hash:
-                    needs_update = False
-                    typer.echo(f"✅ {agent_name}: No changes (environment: {current_env})")
-                else:
-                    typer.echo(f"🔄 {agent_name}: Config changed, will update (environment: {current_env})")
-            else:
-                typer.echo(f"🆕 {agent_name}: New environment detected, will create/update (environment: {current_env})")
-            
-            if not needs_update:
-                continue
-            
-            if dry_run:
-                typer.echo(f"[DRY RUN] Would update agent: {agent_name} (environment: {current_env})")
-                continue
-            
-            # Perform API operation
-            try:
-                # Get environment-specific agent ID from lock file
-                agent_id = locked_agent.get("id") if locked_agent else None
-                
-                # Extract config components
-                conversation_config = agent_config.get("conversation_config", {})
-                platform_settings = agent_config.get("platform_settings")
-                tags = agent_config.get("tags", [])
-                
-                # Add environment tag if specified and not already present
-                if current_env and current_env not in tags:
-                    tags = tags + [current_env]
-                
-                # Use name from config or default to agent definition name
-                agent_display_name = agent_config.get("name", agent_name)
-                
-                if not agent_id:
-                    # Create new agent for this environment
-                    agent_id = elevenlabsapi.create_agent_api(
-                        client=client,
-                        name=agent_display_name,
-                        conversation_config_dict=conversation_config,
-                        platform_settings_dict=platform_settings,
-                        tags=tags
-                    )
-                    typer.echo(f"✅ Created agent {agent_name} for environment '{current_env}' (ID: {agent_id})")
-                else:
-                    # Update existing environment-specific agent
-                    elevenlabsapi.update_agent_api(
-                        client=client,
-                        agent_id=agent_id,
-                        name=agent_display_name,
-                        conversation_config_dict=conversation_config,
-                        platform_settings_dict=platform_settings,
-                        tags=tags
-                    )
-                    typer.echo(f"✅ Updated agent {agent_name} for environment '{current_env}' (ID: {agent_id})")
-                
-                # Update lock file with environment-specific data
-                utils.update_agent_in_lock(lock_data, agent_name, current_env, agent_id, config_hash)
-                changes_made = True
-                
-            except Exception as e:
-                typer.echo(f"❌ Error processing {agent_name}: {e}")
-    
-    # Save lock file if changes were made
-    if changes_made and not dry_run:
-        utils.save_lock_file(str(lock_file_path), lock_data)
-        typer.echo("💾 Updated lock file")
+    _do_sync(client, agents_to_process, environments_to_sync, dry_run)
 
 
 @app.command()
@@ -417,13 +522,13 @@ def status(
     """Show the status of agents."""
     
     # Load agents configuration
-    agents_config_path = Path(AGENTS_CONFIG_FILE)
+    agents_config_path = AGENTS_CONFIG_PATH
     if not agents_config_path.exists():
         typer.echo("❌ agents.json not found. Run 'init' first.", err=True)
         raise typer.Exit(1)
     
     agents_config = utils.read_agent_config(str(agents_config_path))
-    lock_data = utils.load_lock_file(str(Path(LOCK_FILE)))
+    lock_data = utils.load_lock_file(str(LOCK_PATH))
     
     if not agents_config["agents"]:
         typer.echo("No agents configured")
@@ -437,11 +542,14 @@ def status(
             typer.echo(f"❌ Agent '{agent_name}' not found in configuration", err=True)
             raise typer.Exit(1)
     
+    # Output is collected and written in one go rather than line by line
+    lines = []
+    
     # Determine environments to show
     environments_to_show = []
     if environment:
         environments_to_show = [environment]
-        typer.echo(f"Agent Status (Environment: {environment}):")
+        lines.append(f"Agent Status (Environment: {environment}):")
     else:
         # Collect all unique environments from all agents
         env_set = set()
@@ -452,9 +560,9 @@ def status(
                 # Old format compatibility - assume "prod" as default
                 env_set.add("prod")
         environments_to_show = list(env_set)
-        typer.echo("Agent Status (All Environments):")
+        lines.append("Agent Status (All Environments):")
     
-    typer.echo("=" * 50)
+    lines.append("=" * 50)
     
     for agent_def in agents_to_show:
         agent_name_current = agent_def["name"]
@@ -477,43 +585,142 @@ def status(
             locked_agent = utils.get_agent_from_lock(lock_data, agent_name_current, current_env)
             agent_id = locked_agent.get("id") if locked_agent else "Not created for this environment"
             
-            typer.echo(f"\n📋 {agent_name_current}")
-            typer.echo(f"   Environment: {current_env}")
-            typer.echo(f"   Agent ID: {agent_id}")
-            typer.echo(f"   Config: {config_path}")
+            lines.append(f"\n📋 {agent_name_current}")
+            lines.append(f"   Environment: {current_env}")
+            lines.append(f"   Agent ID: {agent_id}")
+            lines.append(f"   Config: {config_path}")
             
             # Check config file status
             if Path(config_path).exists():
                 try:
-                    agent_config = utils.read_agent_config(config_path)
-                    config_hash = utils.calculate_config_hash(agent_config)
-                    typer.echo(f"   Config Hash: {config_hash[:8]}...")
+                    agent_config, config_hash = utils.read_agent_config_with_hash(config_path)
+                    lines.append(f"   Config Hash: {config_hash[:8]}...")
                     
                     # Check lock status for specified environment
                     if locked_agent:
                         if locked_agent.get("hash") == config_hash:
-                            typer.echo(f"   Status: ✅ Synced ({current_env})")
+                            lines.append(f"   Status: ✅ Synced ({current_env})")
                         else:
-                            typer.echo(f"   Status: 🔄 Config changed (needs sync for {current_env})")
+                            lines.append(f"   Status: 🔄 Config changed (needs sync for {current_env})")
                     else:
-                        typer.echo(f"   Status: 🆕 New (needs sync for {current_env})")
+                        lines.append(f"   Status: 🆕 New (needs sync for {current_env})")
                         
                 except Exception as e:
-                    typer.echo(f"   Status: ❌ Config error: {e}")
+                    lines.append(f"   Status: ❌ Config error: {e}")
             else:
-                typer.echo(f"   Status: ❌ Config file not found")
+                lines.append(f"   Status: ❌ Config file not found")
+    
+    typer.echo("\n".join(lines))
+
+
+def _get_file_mtime(file_path: str) -> int:
+    """Get file modification time in nanoseconds, return 0 if file doesn't exist."""
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _watched_config_paths(agents_config: dict, agent_name: typing.Optional[str], environment: str) -> list:
+    """Get the config file paths of the watched agents (all agents if agent_name is None) for an environment."""
+    # Filter agents if specific agent name provided
+    agents_to_watch = agents_config["agents"]
+    if agent_name:
+        agents_to_watch = [agent for agent in agents_config["agents"] if agent["name"] == agent_name]
+    
+    config_paths = []
+    for agent_def in agents_to_watch:
+        # Handle both old and new config structure
+        if "environments" in agent_def:
+            if environment in agent_def["environments"]:
+                config_paths.append(agent_def["environments"][environment]["config"])
+        else:
+            # Old structure - backward compatibility
+            if "config" in agent_def:
+                config_paths.append(agent_def["config"])
+    return config_paths
+
+
+def _detect_config_changes(
+    file_timestamps: dict,
+    agent_name: typing.Optional[str],
+    environment: str,
+    announce: bool = True
+) -> typing.Optional[dict]:
+    """
+    Checks whether agents.json or any watched config file changed since the last check.
+
+    file_timestamps maps each file to the modification time seen last, and is updated in
+    place. Returns the parsed agents.json if anything changed, otherwise None.
+    """
+    # A single stat per file both checks existence and gets the modification time
+    agents_mtime = _get_file_mtime(AGENTS_CONFIG_FILE)
+    if not agents_mtime:
+        return None
+    
+    # Load agents configuration
+    try:
+        agents_config = utils.read_agent_config(AGENTS_CONFIG_FILE)
+    except Exception:
+        return None
+    
+    # Record every changed file, so a burst of edits coalesced into one event
+    # wakeup is handled by a single sync
+    changed = False
+    
+    # Check agents.json itself
+    if file_timestamps.get(AGENTS_CONFIG_FILE, 0) != agents_mtime:
+        file_timestamps[AGENTS_CONFIG_FILE] = agents_mtime
+        if announce:
+            typer.echo(f"📝 Detected change in {AGENTS_CONFIG_FILE}")
+        changed = True
+    
+    # Check individual agent config files (missing files are skipped)
+    for config_path in _watched_config_paths(agents_config, agent_name, environment):
+        config_mtime = _get_file_mtime(config_path)
+        if config_mtime and file_timestamps.get(config_path, 0) != config_mtime:
+            file_timestamps[config_path] = config_mtime
+            if announce:
+                typer.echo(f"📝 Detected change in {config_path}")
+            changed = True
+    
+    return agents_config if changed else None
+
+
+# Filesystem event types that can change a file's content; opened/closed events,
+# which watch's own reads would otherwise trigger, are ignored
+_CONFIG_EVENT_TYPES = ("created", "modified", "moved", "deleted")
+
+
+def _is_config_event(event) -> bool:
+    """Whether a watchdog event is a content change to (or a move from or to) a JSON file."""
+    if event.is_directory or event.event_type not in _CONFIG_EVENT_TYPES:
+        return False
+    paths = [event.src_path, getattr(event, "dest_path", "")]
+    return any(str(path).endswith(".json") for path in paths)
 
 
 @app.command()
 def watch(
     agent_name: str = typer.Option(None, "--agent", help="Specific agent name to watch (defaults to all agents)"),
     environment: str = typer.Option("prod", "--env", help="Environment to watch"),
-    interval: int = typer.Option(5, "--interval", help="Check interval in seconds")
+    interval: int = typer.Option(5, "--interval", help="Check interval in seconds (used when watchdog is not installed)")
 ):
     """Watch for config changes and auto-sync agents."""
+    import queue
     import time
     
-    typer.echo(f"👀 Watching for config changes (checking every {interval}s)...")
+    # Use filesystem events when watchdog is installed, otherwise poll every interval seconds
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        Observer = None
+    
+    if Observer is not None:
+        typer.echo("👀 Watching for config changes...")
+    else:
+        typer.echo(f"👀 Watching for config changes (checking every {interval}s)...")
     if agent_name:
         typer.echo(f"Agent: {agent_name}")
     else:
@@ -524,187 +731,100 @@ def watch(
     # Track file modification times
     file_timestamps = {}
     
-    def get_file_mtime(file_path: Path) -> float:
-        """Get file modification time, return 0 if file doesn't exist."""
-        try:
-            return file_path.stat().st_mtime if file_path.exists() else 0
-        except OSError:
-            return 0
-    
-    def check_for_changes() -> bool:
-        """Check if any config files have changed."""
-        # Load agents configuration
-        agents_config_path = Path(AGENTS_CONFIG_FILE)
-        if not agents_config_path.exists():
-            return False
+    # Filesystem event plumbing (only used when watchdog is available)
+    fs_events = queue.Queue()
+    scheduled_watches = {}
+    observer = None
+    
+    if Observer is not None:
+        class ConfigEventHandler(FileSystemEventHandler):
+            """Queue writes, creations, moves and deletions of JSON files."""
+            
+            def on_any_event(self, event):
+                if _is_config_event(event):
+                    fs_events.put(event.src_path)
         
+        event_handler = ConfigEventHandler()
+        observer = Observer()
+    
+    def schedule_watches() -> None:
+        """Watch the directories holding agents.json and the watched agent configs."""
+        watched_files = [AGENTS_CONFIG_FILE]
         try:
-            agents_config = utils.read_agent_config(str(agents_config_path))
+            watched_files.extend(_watched_config_paths(utils.read_agent_config(AGENTS_CONFIG_FILE), agent_name, environment))
         except Exception:
-            return False
+            pass
         
-        # Filter agents if specific agent name provided
-        agents_to_watch = agents_config["agents"]
-        if agent_name:
-            agents_to_watch = [agent for agent in agents_config["agents"] if agent["name"] == agent_name]
+        directories = {os.path.abspath(os.path.dirname(path) or ".") for path in watched_files}
+        for directory in directories - scheduled_watches.keys():
+            if os.path.isdir(directory):
+                scheduled_watches[directory] = observer.schedule(event_handler, directory, recursive=False)
+        for directory in scheduled_watches.keys() - directories:
+            observer.unschedule(scheduled_watches.pop(directory))
+    
+    def wait_for_next_check() -> None:
+        """Block until the next change check is due."""
+        if observer is None:
+            time.sleep(interval)
+            return
         
-        # Check agents.json itself
-        agents_mtime = get_file_mtime(agents_config_path)
-        if file_timestamps.get(str(agents_config_path), 0) != agents_mtime:
-            file_timestamps[str(agents_config_path)] = agents_mtime
-            typer.echo(f"📝 Detected change in {AGENTS_CONFIG_FILE}")
-            return True
+        schedule_watches()
         
-        # Check individual agent config files
-        for agent_def in agents_to_watch:
-            # Handle both old and new config structure
-            config_paths = []
-            if "environments" in agent_def:
-                if environment in agent_def["environments"]:
-                    config_paths.append(agent_def["environments"][environment]["config"])
-            else:
-                # Old structure - backward compatibility
-                if "config" in agent_def:
-                    config_paths.append(agent_def["config"])
-            
-            for config_path in config_paths:
-                config_path_obj = Path(config_path)
-                if config_path_obj.exists():
-                    config_mtime = get_file_mtime(config_path_obj)
-                    if file_timestamps.get(str(config_path_obj), 0) != config_mtime:
-                        file_timestamps[str(config_path_obj)] = config_mtime
-                        typer.echo(f"📝 Detected change in {config_path}")
-                        return True
+        # Block until a filesystem event arrives, waking up periodically so Ctrl+C is handled
+        while True:
+            try:
+                fs_events.get(timeout=1)
+                break
+            except queue.Empty:
+                continue
         
-        return False
+        # Coalesce the burst of events a single save usually produces
+        while True:
+            try:
+                fs_events.get(timeout=WATCH_DEBOUNCE_SECONDS)
+            except queue.Empty:
+                break
+    
+    # Initialize ElevenLabs client once so its connection pool is reused across syncs
+    try:
+        client = elevenlabsapi.get_elevenlabs_client()
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
     
     # Initialize file timestamps
-    check_for_changes()
+    _detect_config_changes(file_timestamps, agent_name, environment, announce=False)
+    
+    if observer is not None:
+        observer.start()
     
     try:
         while True:
-            if check_for_changes():
+            # _detect_config_changes hands back the agents.json it already parsed, so it is not read twice
+            agents_config = _detect_config_changes(file_timestamps, agent_name, environment)
+            if agents_config is not None:
                 typer.echo("🔄 Running sync...")
                 
-                # Call sync programmatically with the same parameters
+                # Run the same sync logic as the sync command for the watched environment
                 try:
-                    # Load agents configuration
-                    agents_config_path = Path(AGENTS_CONFIG_FILE)
-                    if not agents_config_path.exists():
-                        typer.echo("❌ agents.json not found")
-                        time.sleep(interval)
-                        continue
-                    
-                    agents_config = utils.read_agent_config(str(agents_config_path))
-                    lock_file_path = Path(LOCK_FILE)
-                    lock_data = utils.load_lock_file(str(lock_file_path))
-                    
                     # Filter agents if specific agent name provided
                     agents_to_process = agents_config["agents"]
                     if agent_name:
                         agents_to_process = [agent for agent in agents_config["agents"] if agent["name"] == agent_name]
                     
-                    # Initialize ElevenLabs client
-                    client = elevenlabsapi.get_elevenlabs_client()
-                    changes_made = False
-                    
-                    for agent_def in agents_to_process:
-                        current_agent_name = agent_def["name"]
-                        
-                        # Handle both old and new config structure
-                        config_path = None
-                        if "environments" in agent_def:
-                            if environment in agent_def["environments"]:
-                                config_path = agent_def["environments"][environment]["config"]
-                            else:
-                                continue
-                        else:
-                            # Old structure - backward compatibility
-                            config_path = agent_def.get("config")
-                            if not config_path:
-                                continue
-                        
-                        # Check if config file exists
-                        if not Path(config_path).exists():
-                            continue
-                        
-                        # Load agent config
-                        try:
-                            agent_config = utils.read_agent_config(config_path)
-                        except Exception:
-                            continue
-                        
-                        # Calculate config hash
-                        config_hash = utils.calculate_config_hash(agent_config)
-                        
-                        # Get environment-specific agent data from lock file
-                        locked_agent = utils.get_agent_from_lock(lock_data, current_agent_name, environment)
-                        
-                        needs_update = True
-                        if locked_agent and locked_agent.get("hash") == config_hash:
-                            needs_update = False
-                        
-                        if not needs_update:
-                            continue
-                        
-                        # Perform API operation
-                        try:
-                            # Get environment-specific agent ID from lock file
-                            agent_id = locked_agent.get("id") if locked_agent else None
-                            
-                            # Extract config components
-                            conversation_config = agent_config.get("conversation_config", {})
-                            platform_settings = agent_config.get("platform_settings")
-                            tags = agent_config.get("tags", [])
-                            
-                            # Add environment tag if specified and not already present
-                            if environment and environment not in tags:
-                                tags = tags + [environment]
-                            
-                            # Use name from config or default to agent definition name
-                            agent_display_name = agent_config.get("name", current_agent_name)
-                            
-                            if not agent_id:
-                                # Create new agent for this environment
-                                agent_id = elevenlabsapi.create_agent_api(
-                                    client=client,
-                                    name=agent_display_name,
-                                    conversation_config_dict=conversation_config,
-                                    platform_settings_dict=platform_settings,
-                                    tags=tags
-                                )
-                                typer.echo(f"✅ Created agent {current_agent_name} for environment '{environment}' (ID: {agent_id})")
-                            else:
-                                # Update existing environment-specific agent
-                                elevenlabsapi.update_agent_api(
-                                    client=client,
-                                    agent_id=agent_id,
-                                    name=agent_display_name,
-                                    conversation_config_dict=conversation_config,
-                                    platform_settings_dict=platform_settings,
-                                    tags=tags
-                                )
-                                typer.echo(f"✅ Updated agent {current_agent_name} for environment '{environment}' (ID: {agent_id})")
-                            
-                            # Update lock file with environment-specific data
-                            utils.update_agent_in_lock(lock_data, current_agent_name, environment, agent_id, config_hash)
-                            changes_made = True
-                            
-                        except Exception as e:
-                            typer.echo(f"❌ Error processing {current_agent_name}: {e}")
-                    
-                    # Save lock file if changes were made
-                    if changes_made:
-                        utils.save_lock_file(str(lock_file_path), lock_data)
-                        typer.echo("💾 Updated lock file")
+                    _do_sync(client, agents_to_process, [environment])
                     
                 except Exception as e:
                     typer.echo(f"❌ Error during sync: {e}")
             
-            time.sleep(interval)
+            wait_for_next_check()
             
     except KeyboardInterrupt:
         typer.echo("\n👋 Stopping watch mode")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
 
 
 @app.command()
@@ -712,7 +832,7 @@ def list_agents():
     """List all configured agents."""
     
     # Load agents configuration
-    agents_config_path = Path(AGENTS_CONFIG_FILE)
+    agents_config_path = AGENTS_CONFIG_PATH
     if not agents_config_path.exists():
         typer.echo("❌ agents.json not found. Run 'init' first.", err=True)
         raise typer.Exit(1)
@@ -723,24 +843,26 @@ def list_agents():
         typer.echo("No agents configured")
         return
     
-    typer.echo("Configured Agents:")
-    typer.echo("=" * 30)
+    # Output is collected and written in one go rather than line by line
+    lines = ["Configured Agents:", "=" * 30]
     
     for i, agent_def in enumerate(agents_config["agents"], 1):
-        typer.echo(f"{i}. {agent_def['name']}")
+        lines.append(f"{i}. {agent_def['name']}")
         
         # Handle both old and new config structure
         if "environments" in agent_def:
             # New structure - show all environments
-            typer.echo("   Environments:")
+            lines.append("   Environments:")
             for env_name, env_config in agent_def["environments"].items():
-                typer.echo(f"     {env_name}: {env_config['config']}")
+                lines.append(f"     {env_name}: {env_config['config']}")
         else:
             # Old structure - backward compatibility
             config_path = agent_def.get("config", "No config path")
-            typer.echo(f"   Config: {config_path}")
+            lines.append(f"   Config: {config_path}")
         
-        typer.echo()
+        lines.append("")
+    
+    typer.echo("\n".join(lines))
 
 
 @app.command()
@@ -754,7 +876,7 @@ def fetch(
     """Fetch all agents from ElevenLabs workspace and add them to local configuration."""
     
     # Check if agents.json exists
-    agents_config_path = Path(AGENTS_CONFIG_FILE)
+    agents_config_path = AGENTS_CONFIG_PATH
     if not agents_config_path.exists():
         typer.echo("❌ agents.json not found. Run 'convai init' first.", err=True)
         raise typer.Exit(1)
@@ -766,22 +888,12 @@ def fetch(
         # Use agent_name as search term if provided, otherwise use search parameter
         search_term = agent_name or search
         
-        # Fetch all agents from ElevenLabs
-        typer.echo("🔍 Fetching agents from ElevenLabs...")
-        agents_list = elevenlabsapi.list_agents_api(client, search=search_term)
-        
-        if not agents_list:
-            typer.echo("No agents found in your ElevenLabs workspace.")
-            return
-        
-        typer.echo(f"Found {len(agents_list)} agent(s)")
-        
         # Load existing config
         agents_config = utils.read_agent_config(str(agents_config_path))
         existing_agent_names = {agent["name"] for agent in agents_config["agents"]}
         
         # Load lock file to check for existing agent IDs per environment
-        lock_file_path = Path(LOCK_FILE)
+        lock_file_path = LOCK_PATH
         lock_data = utils.load_lock_file(str(lock_file_path))
         existing_agent_ids = set()
         
@@ -791,79 +903,115 @@ def fetch(
                 if "id" in env_data:
                     existing_agent_ids.add(env_data["id"])
         
+        agents_found = 0
+        agents_to_add = 0
+        name_suffixes = {}
         new_agents_added = 0
+        pending_fetches = []
         
-        for agent_meta in agents_list:
-            agent_id = agent_meta["agent_id"]
-            agent_name_remote = agent_meta["name"]
-            
-            # Skip if agent already exists by ID (in any environment)
-            if agent_id in existing_agent_ids:
-                typer.echo(f"⏭️  Skipping '{agent_name_remote}' - already exists (ID: {agent_id})")
-                continue
-            
-            # Check for name conflicts
-            if agent_name_remote in existing_agent_names:
-                # Generate a unique name
-                counter = 1
-                original_name = agent_name_remote
-                while agent_name_remote in existing_agent_names:
-                    agent_name_remote = f"{original_name}_{counter}"
-                    counter += 1
-                typer.echo(f"⚠️  Name conflict: renamed '{original_name}' to '{agent_name_remote}'")
-            
-            if dry_run:
-                typer.echo(f"[DRY RUN] Would fetch agent: {agent_name_remote} (ID: {agent_id}) for environment: {environment}")
-                continue
-            
-            try:
-                # Fetch detailed agent configuration
-                typer.echo(f"📥 Fetching config for '{agent_name_remote}'...")
-                agent_details = elevenlabsapi.get_agent_api(client, agent_id)
-                
-                # Extract configuration components
-                conversation_config = agent_details.get("conversation_config", {})
-                platform_settings = agent_details.get("platform_settings", {})
-                tags = agent_details.get("tags", [])
-                
-                # Create agent config structure
-                agent_config = {
-                    "name": agent_name_remote,
-                    "conversation_config": conversation_config,
-                    "platform_settings": platform_settings,
-                    "tags": tags
-                }
+        # Fetch all agents from ElevenLabs
+        typer.echo("🔍 Fetching agents from ElevenLabs...")
+        executor = ThreadPoolExecutor(max_workers=SYNC_MAX_WORKERS)
+        try:
+            # Agents are listed page by page, and each detailed config is requested as soon
+            # as its agent is listed rather than after the whole listing
+            for agent_meta in elevenlabsapi.list_agents_api(client, search=search_term):
+                agents_found += 1
+                agent_id = agent_meta["agent_id"]
+                agent_name_remote = agent_meta["name"]
                 
-                # Generate config file path
-                safe_name = agent_name_remote.lower().replace(" ", "_").replace("[", "").replace("]", "")
-                config_path = f"{output_dir}/{safe_name}.json"
+                # Skip if agent already exists by ID (in any environment)
+                if agent_id in existing_agent_ids:
+                    typer.echo(f"⏭️  Skipping '{agent_name_remote}' - already exists (ID: {agent_id})")
+                    continue
                 
-                # Create config file
-                config_file_path = Path(config_path)
-                config_file_path.parent.mkdir(parents=True, exist_ok=True)
-                utils.write_agent_config(str(config_file_path), agent_config)
+                # Check for name conflicts
+                if agent_name_remote in existing_agent_names:
+                    # Generate a unique name, resuming after the last suffix given to this name
+                    # (names are never released, so lower suffixes are still taken)
+                    original_name = agent_name_remote
+                    counter = name_suffixes.get(original_name, 0) + 1
+                    while f"{original_name}_{counter}" in existing_agent_names:
+                        counter += 1
+                    name_suffixes[original_name] = counter
+                    agent_name_remote = f"{original_name}_{counter}"
+                    typer.echo(f"⚠️  Name conflict: renamed '{original_name}' to '{agent_name_remote}'")
                 
-                # Create new agent entry for agents.json (NO ID field - stored in lock file per environment)
-                new_agent = {
-                    "name": agent_name_remote,
-                    "config": config_path
-                }
+                agents_to_add += 1
+                if dry_run:
+                    typer.echo(f"[DRY RUN] Would fetch agent: {agent_name_remote} (ID: {agent_id}) for environment: {environment}")
+                    continue
                 
-                # Add to agents config
-                agents_config["agents"].append(new_agent)
+                typer.echo(f"📥 Fetching config for '{agent_name_remote}'...")
+                # Claim the name and ID now so later agents in this fetch are checked against them
                 existing_agent_names.add(agent_name_remote)
                 existing_agent_ids.add(agent_id)
+                pending_fetches.append((agent_id, agent_name_remote, executor.submit(elevenlabsapi.get_agent_api, client, agent_id)))
+            
+            if not agents_found:
+                executor.shutdown()
+                typer.echo("No agents found in your ElevenLabs workspace.")
+                return
+            
+            typer.echo(f"Found {agents_found} agent(s)")
+            
+            # Results are handled in listing order so agents.json stays deterministic
+            for agent_id, agent_name_remote, future in pending_fetches:
+                try:
+                    agent_details = future.result()
+                    
+                    # Extract configuration components
+                    conversation_config = agent_details.get("conversation_config", {})
+                    platform_settings = agent_details.get("platform_settings", {})
+                    tags = agent_details.get("tags", [])
+                    
+                    # Create agent config structure
+                    agent_config = {
+                        "name": agent_name_remote,
+                        "conversation_config": conversation_config,
+                        "platform_settings": platform_settings,
+                        "tags": tags
+                    }
+                    
+                    # Generate config file path
+                    safe_name = _safe_name(agent_name_remote)
+                    config_path = f"{output_dir}/{safe_name}.json"
+                    
+                    # Create config file
+                    config_file_path = Path(config_path)
+                    utils.write_agent_config(str(config_file_path), agent_config)
+                    
+                    # Create new agent entry for agents.json (NO ID field - stored in lock file per environment)
+                    new_agent = {
+                        "name": agent_name_remote,
+                        "config": config_path
+                    }
+                    
+                    # Add to agents config
+                    agents_config["agents"].append(new_agent)
+                    
+                    # Update lock file with environment-specific agent ID
+                    config_hash = utils.calculate_agent_config_hash(agent_config)
+                    utils.update_agent_in_lock(lock_data, agent_name_remote, environment, agent_id, config_hash)
+                    
+                    typer.echo(f"✅ Added '{agent_name_remote}' (config: {config_path}) for environment: {environment}")
+                    new_agents_added += 1
                 
-                # Update lock file with environment-specific agent ID
-                config_hash = utils.calculate_config_hash(agent_config)
-                utils.update_agent_in_lock(lock_data, agent_name_remote, environment, agent_id, config_hash)
-                
-                typer.echo(f"✅ Added '{agent_name_remote}' (config: {config_path}) for environment: {environment}")
-                new_agents_added += 1
-                
-            except Exception as e:
-                typer.echo(f"❌ Error fetching agent '{agent_name_remote}': {e}")
-                continue
+                except Exception as e:
+                    typer.echo(f"❌ Error fetching agent '{agent_name_remote}': {e}")
+                    continue
+        except KeyboardInterrupt:
+            # Stop listing and cancel the requests that have not started (those in flight
+            # cannot be interrupted), then keep the agents whose config files were written
+            for _, _, future in pending_fetches:
+                future.cancel()
+            executor.shutdown(wait=False)
+            if not dry_run and new_agents_added > 0:
+                utils.write_agent_config(str(agents_config_path), agents_config)
+                utils.save_lock_file(str(lock_file_path), lock_data)
+                typer.echo(f"💾 Updated {AGENTS_CONFIG_FILE} and {LOCK_FILE}")
+            raise
+        executor.shutdown()
         
         if not dry_run and new_agents_added > 0:
             # Save updated agents.json
@@ -875,7 +1023,7 @@ def fetch(
             typer.echo(f"💾 Updated {AGENTS_CONFIG_FILE} and {LOCK_FILE}")
         
         if dry_run:
-            typer.echo(f"[DRY RUN] Would add {len([a for a in agents_list if a['agent_id'] not in existing_agent_ids])} new agent(s) for environment: {environment}")
+            typer.echo(f"[DRY RUN] Would add {agents_to_add} new agent(s) for environment: {environment}")
         else:
             typer.echo(f"✅ Successfully added {new_agents_added} new agent(s) for environment: {environment}")
             if new_agents_added > 0:
@@ -896,13 +1044,13 @@ def widget(
     """Generate HTML widget snippet for an agent."""
     
     # Load agents configuration
-    agents_config_path = Path(AGENTS_CONFIG_FILE)
+    agents_config_path = AGENTS_CONFIG_PATH
     if not agents_config_path.exists():
         typer.echo("❌ agents.json not found. Run 'convai init' first.", err=True)
         raise typer.Exit(1)
     
     # Load lock file to get agent ID
-    lock_file_path = Path(LOCK_FILE)
+    lock_file_path = LOCK_PATH
     lock_data = utils.load_lock_file(str(lock_file_path))
     
     # Check if agent exists in config
@@ -1,10 +1,163 @@
 import hashlib
 import json
-import os # For write_agent_config to ensure directory exists
+import os
+import stat
+import threading
 import typing
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder/decoder
+    orjson = None
+
 LOCK_FILE_AGENTS_KEY = "agents"
 
+# Top-level agent config keys that sync uploads; nothing else in a config reaches ElevenLabs
+AGENT_CONFIG_UPLOADED_KEYS = ("name", "conversation_config", "platform_settings", "tags")
+
+# Raw bytes (and, once computed, the config hash) of config files already read in this
+# process, keyed by absolute path and validated against a stat signature so edits
+# (including atomic replaces) are picked up.
+_CONFIG_CACHE: typing.Dict[str, typing.Tuple[typing.Tuple[int, int, int], bytes, typing.Optional[str]]] = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+# Encoder producing the canonical form hashed by calculate_config_hash. Its output is
+# identical to json.dumps(config, sort_keys=True, indent=None), so existing lock file
+# hashes stay valid; reusing one instance avoids building an encoder on every call.
+_HASH_ENCODER = json.JSONEncoder(sort_keys=True)
+
+
+# The process umask, read once at import (os.umask can only be read by setting it), so
+# newly created files get the mode open() would have given them
+
+
+def _json_loads(data: bytes) -> typing.Any:
+    """Parses JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: typing.Any) -> bytes:
+    """
+    Serializes an object to pretty-printed UTF-8 JSON bytes.
+
+    Both orjson and the stdlib fallback use a 2-space indent, keep non-ASCII characters
+    as-is and add a trailing newline. Their output is the same except for floats in
+    exponent notation: orjson writes 1e16 and 1e-7 where json writes 1e+16 and 1e-07.
+    Both forms parse to the same value.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _stat_signature(st: os.stat_result) -> typing.Tuple[int, int, int]:
+    """Returns the (mtime_ns, size, inode) triple used to detect file changes."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _read_config_bytes_with_signature(file_path: str) -> typing.Tuple[bytes, typing.Tuple[int, int, int]]:
+    """
+    Returns the raw contents of a config file and the stat signature of that version of
+    the file, served from the cache when the file has not changed since it was last read.
+    """
+    cache_key = os.path.abspath(file_path)
+    signature = _stat_signature(os.stat(file_path))
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE.get(cache_key)
+    if cached is not None and cached[0] == signature:
+        return cached[1], signature
+
+    with open(file_path, 'rb') as f:
+        data = f.read()
+        signature = _stat_signature(os.fstat(f.fileno()))
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE[cache_key] = (signature, data, None)
+    return data, signature
+
+
+def _read_config_bytes(file_path: str) -> bytes:
+    """
+    Returns the raw contents of a config file, served from the cache when the file
+    has not changed since it was last read.
+    """
+    return _read_config_bytes_with_signature(file_path)[0]
+
+
+def _create_temp_file(directory: str, name: str) -> typing.Tuple[int, str]:
+    """
+    Creates a new, uniquely named temporary file for name in directory and opens it for writing.
+
+    The file is created with mode 0o666, so the kernel applies the current umask just as it
+    would for a file created by open(). Returns the file descriptor and the file's path.
+    """
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+    while True:
+        tmp_path = os.path.join(directory, f"{name}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(tmp_path, flags, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+def _write_bytes_if_changed(file_path: str, data: bytes, fsync: bool = False) -> bool:
+    """
+    Atomically replaces a file's contents with data, unless it already holds exactly those bytes.
+
+    The bytes are written to a uniquely named temporary file next to the target, which is
+    then moved over it, so readers (such as watch) never see a partially written file and
+    concurrent writers (such as watch and a manual sync) cannot clobber each other's
+    temporary file. Symlinks are resolved first, so the link is kept and its target is
+    updated, and the file keeps its permission bits. With fsync, the temporary file is
+    flushed to disk before the move, so a crash cannot leave an empty or truncated file
+    behind. Missing parent directories are created. Skipping identical writes leaves the
+    file's mtime alone. Returns True if the file was written.
+    """
+    target_path = os.path.realpath(file_path)
+    mode = None
+    try:
+        with open(target_path, 'rb') as f:
+            if f.read() == data:
+                return False
+            mode = stat.S_IMODE(os.fstat(f.fileno()).st_mode)
+    except FileNotFoundError:
+        pass
+
+    directory, name = os.path.split(target_path)
+    try:
+        fd, tmp_path = _create_temp_file(directory, name)
+    except FileNotFoundError:
+        # Only create the directory once a write shows it is missing, rather than
+        # paying for os.makedirs on every write into an existing directory
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = _create_temp_file(directory, name)
+    try:
+        try:
+            if mode is not None:
+                os.chmod(tmp_path, mode)
+            remaining = memoryview(data)
+            while remaining:
+                remaining = remaining[os.write(fd, remaining):]
+            if fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True
+
+
+def _invalidate_config_cache(file_path: str) -> None:
+    """Drops any cached contents for a config file that is about to be rewritten."""
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE.pop(os.path.abspath(file_path), None)
+
 def calculate_config_hash(config: dict) -> str:
     """
     Calculates the MD5 hash of a configuration dictionary.
@@ -16,16 +169,54 @@ def calculate_config_hash(config: dict) -> str:
         The hexadecimal representation of the MD5 hash.
     """
     # Convert the dictionary to a sorted JSON string to ensure consistent hashes
-    config_string = json.dumps(config, sort_keys=True, indent=None) # indent=None for more compact string
+    config_string = _HASH_ENCODER.encode(config)
     
     # Calculate MD5 hash
     hash_object = hashlib.md5(config_string.encode('utf-8'))
     return hash_object.hexdigest()
 
+def calculate_agent_config_hash(config: dict) -> str:
+    """
+    Calculates the config hash of an agent configuration, covering only the uploaded keys.
+
+    Editing other top-level keys (such as local notes) does not change the hash, so it
+    does not trigger an update. For a config made up of uploaded keys only, the result
+    is the same as calculate_config_hash(config).
+
+    Args:
+        config: The agent configuration dictionary.
+
+    Returns:
+        The hexadecimal representation of the MD5 hash.
+    """
+    return calculate_config_hash({key: config[key] for key in AGENT_CONFIG_UPLOADED_KEYS if key in config})
+
+def calculate_file_hash(file_path: str) -> str:
+    """
+    Calculates the MD5 hash of a configuration file's raw bytes, without parsing it.
+
+    Unlike calculate_config_hash this depends on formatting, so it can only confirm
+    that a file is byte-for-byte unchanged.
+
+    Args:
+        file_path: The path to the configuration file.
+
+    Returns:
+        The hexadecimal representation of the MD5 hash.
+
+    Raises:
+        FileNotFoundError: If the configuration file is not found.
+    """
+    return hashlib.md5(_read_config_bytes(file_path)).hexdigest()
+
 def read_agent_config(file_path: str) -> dict:
     """
     Reads an agent configuration file.
 
+    Unchanged files are served from an in-process cache. Each call returns a newly
+    decoded dictionary (decoding the cached bytes is cheaper than copy.deepcopy), so
+    callers are free to mutate the result.
+
     Args:
         file_path: The path to the JSON configuration file.
 
@@ -37,8 +228,7 @@ def read_agent_config(file_path: str) -> dict:
         json.JSONDecodeError: If the configuration file contains invalid JSON.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _json_loads(_read_config_bytes(file_path))
     except FileNotFoundError:
         # Log or handle specific error cases if needed, then re-raise
         # print(f"Error: Configuration file not found at {file_path}")
@@ -48,10 +238,85 @@ def read_agent_config(file_path: str) -> dict:
         # print(f"Error: Invalid JSON in configuration file {file_path}")
         raise
 
+def read_agent_config_with_hash(file_path: str) -> typing.Tuple[dict, str]:
+    """
+    Reads an agent configuration file together with its config hash.
+
+    The hash is computed once per version of the file and reused on later calls
+    while the file is unchanged.
+
+    Args:
+        file_path: The path to the JSON configuration file.
+
+    Returns:
+        A tuple of the agent configuration dictionary and its calculate_agent_config_hash value.
+
+    Raises:
+        FileNotFoundError: If the configuration file is not found.
+        json.JSONDecodeError: If the configuration file contains invalid JSON.
+    """
+    return parse_agent_config_with_hash(file_path, _read_config_bytes(file_path))
+
+def read_config_file_with_hash(file_path: str) -> typing.Tuple[bytes, str, int, int]:
+    """
+    Reads a configuration file's raw bytes together with their file hash, mtime_ns and size.
+
+    All four values describe the same version of the file, so none of them can come
+    from an edit made between separate reads. Pass the bytes to
+    parse_agent_config_with_hash to get the matching config and config hash.
+
+    Args:
+        file_path: The path to the configuration file.
+
+    Returns:
+        A tuple of the raw bytes, their calculate_file_hash value, and the file's
+        mtime_ns and size.
+
+    Raises:
+        FileNotFoundError: If the configuration file is not found.
+    """
+    data, (mtime_ns, size, _) = _read_config_bytes_with_signature(file_path)
+    return data, hashlib.md5(data).hexdigest(), mtime_ns, size
+
+def parse_agent_config_with_hash(file_path: str, data: bytes) -> typing.Tuple[dict, str]:
+    """
+    Parses the raw bytes read from an agent configuration file and calculates their config hash.
+
+    The hash is computed once per version of the file and reused on later calls
+    while the file is unchanged.
+
+    Args:
+        file_path: The path the bytes were read from.
+        data: The bytes returned by read_config_file_with_hash.
+
+    Returns:
+        A tuple of the agent configuration dictionary and its calculate_agent_config_hash value.
+
+    Raises:
+        json.JSONDecodeError: If the bytes are not valid JSON.
+    """
+    cache_key = os.path.abspath(file_path)
+    config = _json_loads(data)
+
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE.get(cache_key)
+    if cached is not None and cached[1] is data and cached[2] is not None:
+        return config, cached[2]
+
+    config_hash = calculate_agent_config_hash(config)
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE.get(cache_key)
+        # Only attach the hash if the entry still holds the bytes it was computed from
+        if cached is not None and cached[1] is data:
+            _CONFIG_CACHE[cache_key] = (cached[0], data, config_hash)
+    return config, config_hash
+
 def write_agent_config(file_path: str, config: dict) -> None:
     """
     Writes an agent configuration to a file.
 
+    The file is replaced atomically, and left untouched if it already has the same content.
+
     Args:
         file_path: The path to write the JSON configuration file.
         config: The dictionary containing the agent configuration.
@@ -60,49 +325,55 @@ def write_agent_config(file_path: str, config: dict) -> None:
         IOError: If there is an error writing the file.
     """
     try:
-        # Ensure the directory exists before writing.
-        # This is important if file_path includes directories that might not exist.
-        if os.path.dirname(file_path): # Ensure there's a directory part
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        if _write_bytes_if_changed(file_path, _json_dumps(config)):
+            _invalidate_config_cache(file_path)
     except IOError:
         # Log or handle specific error cases if needed, then re-raise
         # print(f"Error: Could not write configuration file to {file_path}")
         raise
 
+def new_lock_data() -> dict:
+    """
+    Returns the lock data of a project with no agents.
+
+    A new dictionary is built on every call, since callers fill it in.
+    """
+    return {LOCK_FILE_AGENTS_KEY: {}}
+
 def load_lock_file(lock_file_path: str) -> dict:
     """
     Loads the lock file. If it doesn't exist or is invalid, returns a default structure.
     """
-    if not os.path.exists(lock_file_path):
-        return {LOCK_FILE_AGENTS_KEY: {}}
     try:
-        with open(lock_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if LOCK_FILE_AGENTS_KEY not in data or not isinstance(data.get(LOCK_FILE_AGENTS_KEY), dict):
-                print(f"Warning: Lock file {lock_file_path} is malformed or missing '{LOCK_FILE_AGENTS_KEY}' key. Initializing with empty agent list.")
-                return {LOCK_FILE_AGENTS_KEY: {}}
-            return data
+        with open(lock_file_path, 'rb') as f:
+            data = _json_loads(f.read())
+    except FileNotFoundError:
+        return new_lock_data()
     except json.JSONDecodeError:
         print(f"Warning: Could not decode JSON from lock file {lock_file_path}. Initializing with empty agent list.")
-        return {LOCK_FILE_AGENTS_KEY: {}}
+        return new_lock_data()
     except IOError:
         print(f"Warning: Could not read lock file {lock_file_path}. Initializing with empty agent list.")
-        return {LOCK_FILE_AGENTS_KEY: {}}
+        return new_lock_data()
+
+    try:
+        agents = data[LOCK_FILE_AGENTS_KEY]
+    except (TypeError, KeyError):  # not a JSON object, or one without the agents key
+        agents = None
+    if not isinstance(agents, dict):
+        print(f"Warning: Lock file {lock_file_path} is malformed or missing '{LOCK_FILE_AGENTS_KEY}' key. Initializing with empty agent list.")
+        return new_lock_data()
+    return data
 
-def save_lock_file(lock_file_path: str, lock_data: dict) -> None:
+def save_lock_file(lock_file_path: str, lock_data: dict) -> bool:
     """
-    Saves the lock data to the lock file.
+    Saves the lock data to the lock file, atomically and only if its content changed.
+
+    The lock file holds the only local record of created agent IDs, so it is flushed to
+    disk before it replaces the previous version. Returns True if the file was written.
     """
     try:
-        # Ensure the directory exists before writing, similar to write_agent_config
-        if os.path.dirname(lock_file_path) and not os.path.exists(os.path.dirname(lock_file_path)):
-             os.makedirs(os.path.dirname(lock_file_path), exist_ok=True)
-
-        with open(lock_file_path, 'w', encoding='utf-8') as f:
-            json.dump(lock_data, f, indent=4, ensure_ascii=False)
+        return _write_bytes_if_changed(lock_file_path, _json_dumps(lock_data), fsync=True)
     except IOError:
         # Consider how to handle this error, e.g., log and raise or just print
         print(f"Error: Could not write lock file to {lock_file_path}")
@@ -114,18 +385,35 @@ def get_agent_from_lock(lock_data: dict, agent_name: str, tag: str) -> typing.Op
     """
     return lock_data.get(LOCK_FILE_AGENTS_KEY, {}).get(agent_name, {}).get(tag)
 
-def update_agent_in_lock(lock_data: dict, agent_name: str, tag: str, agent_id: str, config_hash: str) -> None:
+def update_agent_in_lock(
+    lock_data: dict,
+    agent_name: str,
+    tag: str,
+    agent_id: str,
+    config_hash: str,
+    mtime_ns: typing.Optional[int] = None,
+    file_hash: typing.Optional[str] = None,
+    size: typing.Optional[int] = None
+) -> None:
     """
     Updates or adds an agent's ID and hash in the lock data.
+
+    When given, mtime_ns and size (the config file's modification time and size at the
+    time it was hashed) and file_hash (calculate_file_hash of the file) are stored too,
+    letting sync skip re-reading or re-parsing files that have not changed since.
     """
-    if LOCK_FILE_AGENTS_KEY not in lock_data or not isinstance(lock_data.get(LOCK_FILE_AGENTS_KEY), dict):
-        lock_data[LOCK_FILE_AGENTS_KEY] = {}
-    
-    agents = lock_data[LOCK_FILE_AGENTS_KEY]
-    if agent_name not in agents:
-        agents[agent_name] = {}
+    agents = lock_data.get(LOCK_FILE_AGENTS_KEY)
+    if not isinstance(agents, dict):
+        agents = lock_data[LOCK_FILE_AGENTS_KEY] = {}
     
-    agents[agent_name][tag] = {
+    entry = {
         "id": agent_id,
         "hash": config_hash
     }
+    if mtime_ns is not None:
+        entry["mtime_ns"] = mtime_ns
+    if size is not None:
+        entry["size"] = size
+    if file_hash is not None:
+        entry["file_hash"] = file_hash
+    agents.setdefault(agent_name, {})[tag] = entry
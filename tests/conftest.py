@@ -0,0 +1,32 @@
+import shutil
+
+import pytest
+
+from elevenlabs_cli_tool import utils
+from elevenlabs_cli_tool.main import AGENTS_CONFIG_FILE, LOCK_FILE
+
+
+@pytest.fixture
+def fs(tmp_path, monkeypatch):
+    """An empty project directory, used as the working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def initialized_template(tmp_path_factory):
+    """A project directory with the files `convai init` creates, built once per session."""
+    template = tmp_path_factory.mktemp("initialized_template")
+    (template / "agent_configs").mkdir()
+    utils.write_agent_config(str(template / AGENTS_CONFIG_FILE), {"agents": []})
+    utils.save_lock_file(str(template / LOCK_FILE), utils.new_lock_data())
+    return template
+
+
+@pytest.fixture
+def initialized_fs(initialized_template, tmp_path, monkeypatch):
+    """A fresh copy of the initialized project, used as the working directory."""
+    fs = tmp_path / "fs"
+    shutil.copytree(initialized_template, fs)
+    monkeypatch.chdir(fs)
+    return fs
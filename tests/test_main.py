@@ -1,115 +1,103 @@
 import pytest
 import json
+import os
+import threading
+from concurrent.futures import as_completed
 from typer.testing import CliRunner
 from unittest.mock import patch, MagicMock 
 from pathlib import Path
+from types import SimpleNamespace
 
 # Application and constants
-from elevenlabs_cli_tool.main import app, AGENTS_CONFIG_FILE, LOCK_FILE
+from elevenlabs_cli_tool.main import app, AGENTS_CONFIG_FILE, LOCK_FILE, _detect_config_changes, _is_config_event
 from elevenlabs_cli_tool.utils import LOCK_FILE_AGENTS_KEY 
+from elevenlabs_cli_tool import templates, utils
 
 runner = CliRunner()
 
+
+def _run(*args, **kwargs):
+    """Invokes the CLI without Click's exception capture, so unexpected errors fail the test with their traceback."""
+    return runner.invoke(app, list(args), catch_exceptions=False, **kwargs)
+
+
+def _add_agent_files(fs: Path, name: str, environment: str = "prod", agent_id: str = None) -> Path:
+    """Writes what `add --skip-upload` would for an agent (plus a lock entry if agent_id is given), without the CLI."""
+    config_path = f"agent_configs/{environment}/{name}.json"
+    utils.write_agent_config(str(fs / config_path), templates.get_default_agent_template(name))
+    
+    agents_config = utils.read_agent_config(str(fs / AGENTS_CONFIG_FILE))
+    agents_config["agents"].append({"name": name, "environments": {environment: {"config": config_path}}})
+    utils.write_agent_config(str(fs / AGENTS_CONFIG_FILE), agents_config)
+    
+    if agent_id:
+        lock_data = utils.load_lock_file(str(fs / LOCK_FILE))
+        utils.update_agent_in_lock(lock_data, name, environment, agent_id, "stale")
+        utils.save_lock_file(str(fs / LOCK_FILE), lock_data)
+    return fs / config_path
+
+
 # --- Test for init command ---
-def test_init_command(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        result = runner.invoke(app, ["init"])
-        
-        assert result.exit_code == 0, result.stdout
-        assert f"Created {AGENTS_CONFIG_FILE}" in result.stdout
-        assert f"Created {LOCK_FILE}" in result.stdout
-        
-        agents_dir = fs / "agents"
-        assert agents_dir.is_dir()
-        
-        agents_config_path = fs / AGENTS_CONFIG_FILE
-        assert agents_config_path.is_file()
-        with open(agents_config_path, 'r', encoding='utf-8') as f:
-            config_content = json.load(f)
-            assert config_content == {"agents": []}
-        
-        lock_file_path = fs / LOCK_FILE
-        assert lock_file_path.is_file()
-        with open(lock_file_path, 'r', encoding='utf-8') as f:
-            lock_content = json.load(f)
-            assert lock_content == {LOCK_FILE_AGENTS_KEY: {}}
+def test_init_command(fs):
+    result = _run("init")
+    
+    assert result.exit_code == 0, result.stdout
+    assert f"Created {AGENTS_CONFIG_FILE}" in result.stdout
+    assert f"Created {LOCK_FILE}" in result.stdout
+    
+    agents_dir = fs / "agent_configs"
+    assert agents_dir.is_dir()
+    
+    # Both writers emit 2-space indented JSON with a trailing newline
+    assert (fs / AGENTS_CONFIG_FILE).read_bytes() == b'{\n  "agents": []\n}\n'
+    assert (fs / LOCK_FILE).read_bytes() == b'{\n  "agents": {}\n}\n'
+
+    # Run init again to test existing files
+    result_rerun = _run("init")
+    assert result_rerun.exit_code == 0, result_rerun.stdout
 
-        # Run init again to test existing files
-        result_rerun = runner.invoke(app, ["init"])
-        assert result_rerun.exit_code == 0, result_rerun.stdout
 
+# --- Commands that need an initialized project ---
+@pytest.fixture(scope="module")
+def uninitialized_dir(tmp_path_factory):
+    """One empty directory shared by the no-init tests, which fail before writing anything."""
+    return tmp_path_factory.mktemp("noinit")
 
-# --- Test for add command (without API calls) ---
-def test_add_command_no_init(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        result = runner.invoke(app, ["add", "test_agent"])
-        assert result.exit_code == 1, result.stdout
-        assert "agents.json not found" in result.stdout
+
+@pytest.mark.parametrize("command", [["add", "test_agent"], ["status"], ["list-agents"], ["sync"]])
+def test_command_no_init(uninitialized_dir, monkeypatch, command):
+    monkeypatch.chdir(uninitialized_dir)
+    result = _run(*command)
+    assert result.exit_code == 1, result.stdout
+    assert "agents.json not found" in result.stdout
+    assert not any(uninitialized_dir.iterdir())
 
 
 # --- Test for status command ---
-def test_status_command_no_init(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        result = runner.invoke(app, ["status"])
-        assert result.exit_code == 1, result.stdout
-        assert "agents.json not found" in result.stdout
-
-
-def test_status_command_empty_agents(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        runner.invoke(app, ["init"])
-        
-        result = runner.invoke(app, ["status"])
-        assert result.exit_code == 0, result.stdout
-        assert "No agents configured" in result.stdout
+def test_status_command_empty_agents(initialized_fs):
+    result = _run("status")
+    assert result.exit_code == 0, result.stdout
+    assert "No agents configured" in result.stdout
 
 
 # --- Test for list-agents command ---
-def test_list_agents_command_no_init(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        result = runner.invoke(app, ["list-agents"])
-        assert result.exit_code == 1, result.stdout
-        assert "agents.json not found" in result.stdout
-
-
-def test_list_agents_command_empty_agents(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        runner.invoke(app, ["init"])
-        
-        result = runner.invoke(app, ["list-agents"])
-        assert result.exit_code == 0, result.stdout
-        assert "No agents configured" in result.stdout
+def test_list_agents_command_empty_agents(initialized_fs):
+    result = _run("list-agents")
+    assert result.exit_code == 0, result.stdout
+    assert "No agents configured" in result.stdout
 
 
 # --- Test for sync command ---
-def test_sync_command_no_init(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        result = runner.invoke(app, ["sync"])
-        assert result.exit_code == 1, result.stdout
-        assert "agents.json not found" in result.stdout
-
-
-def test_sync_command_empty_agents(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        runner.invoke(app, ["init"])
+def test_sync_command_empty_agents(initialized_fs):
+    # Sync with empty agents should initialize client but do nothing
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client') as mock_get_client:
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
         
-        # Sync with empty agents should initialize client but do nothing
-        with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client') as mock_get_client:
-            mock_client = MagicMock()
-            mock_get_client.return_value = mock_client
-            
-            result = runner.invoke(app, ["sync"])
-            assert result.exit_code == 0, result.stdout
-            # Client is initialized but no API calls should be made since no agents exist
-            mock_get_client.assert_called_once()
+        result = _run("sync")
+        assert result.exit_code == 0, result.stdout
+        # Client is initialized but no API calls should be made since no agents exist
+        mock_get_client.assert_called_once()
 
 
 # --- Mock tests for add command with API ---
@@ -129,49 +117,243 @@ def mock_elevenlabs_client():
         }
 
 
-def test_add_command_success(tmp_path, mock_elevenlabs_client):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        runner.invoke(app, ["init"])
+def test_add_command_success(initialized_fs, mock_elevenlabs_client):
+    fs = initialized_fs
+    result = _run("add", "test_agent")
+    assert result.exit_code == 0, result.stdout
+    assert "Created config file" in result.stdout
+    assert "Created agent in ElevenLabs with ID: test_agent_id_123" in result.stdout
+    assert "Added agent 'test_agent' to agents.json" in result.stdout
+    
+    # Check that the environment-specific agent config was created
+    config_path = fs / "agent_configs" / "prod" / "test_agent.json"
+    assert config_path.exists()
+    
+    # Check agents.json was updated (agent IDs live in the lock file, per environment)
+    agents_config_path = fs / AGENTS_CONFIG_FILE
+    config = json.loads(agents_config_path.read_bytes())
+    assert len(config["agents"]) == 1
+    assert config["agents"][0]["name"] == "test_agent"
+    assert config["agents"][0]["environments"]["prod"]["config"] == "agent_configs/prod/test_agent.json"
+    
+    lock_content = json.loads((fs / LOCK_FILE).read_bytes())
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["test_agent"]["prod"]["id"] == "test_agent_id_123"
+
+
+def test_add_command_duplicate_agent(initialized_fs, mock_elevenlabs_client):
+    _add_agent_files(initialized_fs, "test_agent", agent_id="test_agent_id_123")  # Added first time
+    
+    result = _run("add", "test_agent")  # Try to add again
+    assert result.exit_code == 1, result.stdout
+    assert "Agent 'test_agent' already exists" in result.stdout
+
+
+def test_add_command_api_error(initialized_fs):
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client', side_effect=Exception("API connection failed")) as mock_get_client:
+        result = _run("add", "test_agent")
+    assert result.exit_code == 1, result.stdout
+    assert "Error creating agent in ElevenLabs" in result.stdout
+    mock_get_client.assert_called_once()
+
+
+def test_sync_command_creates_and_updates_agents(initialized_fs):
+    fs = initialized_fs
+    _add_agent_files(fs, "agent_a")
+    # agent_b already exists remotely with an outdated hash
+    _add_agent_files(fs, "agent_b", agent_id="existing_b")
+    
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client') as mock_get_client, \
+         patch('elevenlabs_cli_tool.elevenlabsapi.create_agent_api') as mock_create, \
+         patch('elevenlabs_cli_tool.elevenlabsapi.update_agent_api') as mock_update:
+        mock_get_client.return_value = MagicMock()
+        mock_create.return_value = "created_a"
+        mock_update.return_value = "existing_b"
         
-        result = runner.invoke(app, ["add", "test_agent"])
+        result = _run("sync")
         assert result.exit_code == 0, result.stdout
-        assert "Created config file" in result.stdout
-        assert "Created agent in ElevenLabs with ID: test_agent_id_123" in result.stdout
-        assert "Added agent 'test_agent' to agents.json" in result.stdout
-        
-        # Check that agent config was created
-        config_path = fs / "agent_configs" / "test_agent.json"
-        assert config_path.exists()
-        
-        # Check agents.json was updated
-        agents_config_path = fs / AGENTS_CONFIG_FILE
-        with open(agents_config_path, 'r') as f:
-            config = json.load(f)
-            assert len(config["agents"]) == 1
-            assert config["agents"][0]["name"] == "test_agent"
-            assert config["agents"][0]["id"] == "test_agent_id_123"
-
-
-def test_add_command_duplicate_agent(tmp_path, mock_elevenlabs_client):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["add", "test_agent"])  # Add first time
-        
-        result = runner.invoke(app, ["add", "test_agent"])  # Try to add again
-        assert result.exit_code == 1, result.stdout
-        assert "Agent 'test_agent' already exists" in result.stdout
+        assert "Created agent agent_a for environment 'prod' (ID: created_a)" in result.stdout
+        assert "Updated agent agent_b for environment 'prod' (ID: existing_b)" in result.stdout
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["tags"] == ["prod"]
+        mock_update.assert_called_once()
+        assert mock_update.call_args.kwargs["agent_id"] == "existing_b"
+    
+    lock_content = json.loads((fs / LOCK_FILE).read_bytes())
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["agent_a"]["prod"]["id"] == "created_a"
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["agent_b"]["prod"]["hash"] != "stale"
+    
+    config_a_stat = os.stat(fs / "agent_configs/prod/agent_a.json")
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["agent_a"]["prod"]["mtime_ns"] == config_a_stat.st_mtime_ns
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["agent_a"]["prod"]["size"] == config_a_stat.st_size
+    
+    # A second sync finds nothing to do without re-reading the untouched configs
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client'), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.update_agent_api') as mock_update, \
+         patch('elevenlabs_cli_tool.utils.read_config_file_with_hash') as mock_read:
+        result = _run("sync")
+        assert result.exit_code == 0, result.stdout
+        assert "agent_a: No changes" in result.stdout
+        mock_update.assert_not_called()
+        mock_read.assert_not_called()
+    
+    # Touching a config without changing its content falls back to the file hash, still without parsing
+    os.utime(fs / "agent_configs/prod/agent_a.json", ns=(0, 0))
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client'), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.update_agent_api') as mock_update, \
+         patch('elevenlabs_cli_tool.utils.parse_agent_config_with_hash') as mock_parse:
+        result = _run("sync")
+        assert result.exit_code == 0, result.stdout
+        assert "agent_a: No changes" in result.stdout
+        mock_update.assert_not_called()
+        mock_parse.assert_not_called()
+    
+    # Reformatting a config changes its bytes but not its config hash
+    config_a = fs / "agent_configs/prod/agent_a.json"
+    config_a.write_text(json.dumps(json.loads(config_a.read_bytes()), indent=4))
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client'), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.update_agent_api') as mock_update:
+        result = _run("sync")
+        assert result.exit_code == 0, result.stdout
+        assert "agent_a: No changes" in result.stdout
+        mock_update.assert_not_called()
+    
+    # An edit that leaves the recorded mtime in place (coarse timestamps) is caught by the size
+    config_a.write_text(json.dumps({**json.loads(config_a.read_bytes()), "tags": ["edited"]}, indent=4))
+    os.utime(config_a, ns=(config_a_stat.st_mtime_ns, config_a_stat.st_mtime_ns))
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client'), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.update_agent_api') as mock_update:
+        result = _run("sync")
+        assert result.exit_code == 0, result.stdout
+        assert "agent_a: Config changed" in result.stdout
+        mock_update.assert_called_once()
 
 
-def test_add_command_api_error(tmp_path):
-    with runner.isolated_filesystem(temp_dir=tmp_path) as fs_str:
-        fs = Path(fs_str)
-        runner.invoke(app, ["init"])
-        
-        with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client') as mock_get_client:
-            mock_get_client.side_effect = Exception("API connection failed")
-            
-            result = runner.invoke(app, ["add", "test_agent"])
-            assert result.exit_code == 1, result.stdout
-            assert "Error creating agent in ElevenLabs" in result.stdout
\ No newline at end of file
+def test_sync_command_interrupt_keeps_finished_agents(initialized_fs):
+    fs = initialized_fs
+    for name in ("agent_a", "agent_b", "agent_c"):
+        _add_agent_files(fs, name)
+    
+    release = threading.Event()
+    def create_agent(**kwargs):
+        if kwargs["name"] != "agent_a":
+            release.wait(5)
+        return f"created_{kwargs['name']}"
+    
+    def interrupted_as_completed(futures):
+        # Ctrl+C arrives once the first push has finished
+        yield next(as_completed(futures))
+        raise KeyboardInterrupt
+    
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client'), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.create_agent_api', side_effect=create_agent) as mock_create, \
+         patch('elevenlabs_cli_tool.main.SYNC_MAX_WORKERS', 1), \
+         patch('elevenlabs_cli_tool.main.as_completed', interrupted_as_completed):
+        try:
+            result = _run("sync")
+        finally:
+            release.set()
+    
+    assert result.exit_code == 1, result.stdout
+    assert "Updated lock file" in result.stdout
+    lock_content = json.loads((fs / LOCK_FILE).read_bytes())
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["agent_a"]["prod"]["id"] == "created_agent_a"
+    # agent_b was already running on the only worker; agent_c was still queued and is never pushed
+    assert "agent_c" not in [call.kwargs["name"] for call in mock_create.call_args_list]
+
+
+def test_fetch_command_adds_remote_agents_in_order(initialized_fs):
+    fs = initialized_fs
+    
+    agents_list = [{"agent_id": "id_1", "name": "Bot"}, {"agent_id": "id_2", "name": "Bot"}, {"agent_id": "id_3", "name": "Other"}, {"agent_id": "id_4", "name": "Bot"}]
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client'), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.list_agents_api', return_value=agents_list), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.get_agent_api') as mock_get:
+        mock_get.side_effect = lambda client, agent_id: {"conversation_config": {"agent": {"prompt": {"prompt": agent_id}}}, "tags": []}
+        result = _run("fetch")
+        assert result.exit_code == 0, result.stdout
+        assert "Name conflict: renamed 'Bot' to 'Bot_1'" in result.stdout
+        assert "Name conflict: renamed 'Bot' to 'Bot_2'" in result.stdout
+        assert "Successfully added 4 new agent(s)" in result.stdout
+    
+    agents_content = json.loads((fs / AGENTS_CONFIG_FILE).read_bytes())
+    assert [agent["name"] for agent in agents_content["agents"]] == ["Bot", "Bot_1", "Other", "Bot_2"]
+    assert json.loads((fs / "agent_configs/bot_1.json").read_bytes())["conversation_config"]["agent"]["prompt"]["prompt"] == "id_2"
+    lock_content = json.loads((fs / LOCK_FILE).read_bytes())
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["Other"]["prod"]["id"] == "id_3"
+
+
+def test_fetch_command_interrupt_keeps_fetched_agents(initialized_fs):
+    fs = initialized_fs
+    agents_list = [{"agent_id": f"id_{i}", "name": f"Bot {i}"} for i in range(1, 5)]
+    
+    release = threading.Event()
+    def get_agent(client, agent_id):
+        if agent_id == "id_3":
+            release.wait(5)
+        return {"conversation_config": {}, "tags": []}
+    
+    safe_name_calls = []
+    def interrupted_safe_name(name):
+        # Ctrl+C arrives while the second fetched agent is being written
+        safe_name_calls.append(name)
+        if len(safe_name_calls) == 2:
+            raise KeyboardInterrupt
+        return name.lower().replace(" ", "_")
+    
+    with patch('elevenlabs_cli_tool.elevenlabsapi.get_elevenlabs_client'), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.list_agents_api', return_value=agents_list), \
+         patch('elevenlabs_cli_tool.elevenlabsapi.get_agent_api', side_effect=get_agent) as mock_get, \
+         patch('elevenlabs_cli_tool.main.SYNC_MAX_WORKERS', 1), \
+         patch('elevenlabs_cli_tool.main._safe_name', interrupted_safe_name):
+        try:
+            result = _run("fetch")
+        finally:
+            release.set()
+    
+    assert result.exit_code == 1, result.stdout
+    agents_content = json.loads((fs / AGENTS_CONFIG_FILE).read_bytes())
+    assert [agent["name"] for agent in agents_content["agents"]] == ["Bot 1"]
+    lock_content = json.loads((fs / LOCK_FILE).read_bytes())
+    assert lock_content[LOCK_FILE_AGENTS_KEY]["Bot 1"]["prod"]["id"] == "id_1"
+    # id_3 was already running on the only worker; id_4 was still queued and is never requested
+    assert "id_4" not in [call.args[1] for call in mock_get.call_args_list]
+
+
+# --- Watch change detection ---
+def test_watch_handles_a_burst_of_edits_as_one_change(initialized_fs, capsys):
+    config_a = _add_agent_files(initialized_fs, "agent_a")
+    config_b = _add_agent_files(initialized_fs, "agent_b")
+    file_timestamps = {}
+    
+    # The initial snapshot records every file without announcing it
+    assert _detect_config_changes(file_timestamps, None, "prod", announce=False) is not None
+    assert _detect_config_changes(file_timestamps, None, "prod") is None
+    assert capsys.readouterr().out == ""
+    
+    # Edit both configs, as one save burst would (explicit mtimes avoid coarse timestamp ticks)
+    for i, config_path in enumerate((config_a, config_b), 1):
+        config_path.write_text(config_path.read_text().replace('"agent_', '"edited_', 1))
+        os.utime(config_path, ns=(i, i))
+    
+    agents_config = _detect_config_changes(file_timestamps, None, "prod")
+    assert [agent["name"] for agent in agents_config["agents"]] == ["agent_a", "agent_b"]
+    output = capsys.readouterr().out
+    assert "Detected change in agent_configs/prod/agent_a.json" in output
+    assert "Detected change in agent_configs/prod/agent_b.json" in output
+    
+    # Both edits were recorded by that one check, so the burst triggers a single sync
+    assert _detect_config_changes(file_timestamps, None, "prod") is None
+
+
+@pytest.mark.parametrize("event, expected", [
+    (SimpleNamespace(is_directory=False, event_type="modified", src_path="agent_configs/prod/a.json"), True),
+    (SimpleNamespace(is_directory=False, event_type="deleted", src_path="agents.json"), True),
+    # Atomic writes move a temporary file over the config
+    (SimpleNamespace(is_directory=False, event_type="moved", src_path="agents.json.tmp", dest_path="agents.json"), True),
+    (SimpleNamespace(is_directory=False, event_type="opened", src_path="agents.json"), False),
+    (SimpleNamespace(is_directory=False, event_type="closed", src_path="agents.json"), False),
+    (SimpleNamespace(is_directory=False, event_type="modified", src_path="agent_configs/prod/notes.txt"), False),
+    (SimpleNamespace(is_directory=True, event_type="modified", src_path="agent_configs.json"), False),
+])
+def test_watch_event_filter(event, expected):
+    assert _is_config_event(event) is expected
@@ -1,4 +1,5 @@
 import pytest
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -28,6 +29,23 @@ def test_calculate_config_hash_key_order_insensitivity():
     config2 = {"setting": "abc", "name": "test", "value": 1} # Different order
     assert utils.calculate_config_hash(config1) == utils.calculate_config_hash(config2)
 
+def test_calculate_config_hash_is_stable():
+    # Hashes are stored in lock files, so the canonical form must never change
+    config = {"name": "test", "value": 1, "nested": {"key": "val", "unicode": "你好"}}
+    assert utils.calculate_config_hash(config) == "cf25056bff2c3bc60973d4e62a88f848"
+
+def test_calculate_agent_config_hash_ignores_local_keys():
+    config = {"name": "agent", "conversation_config": {"agent": {}}, "platform_settings": {}, "tags": ["prod"]}
+    # Matches the plain hash for configs holding only uploaded keys, so existing lock entries stay valid
+    assert utils.calculate_agent_config_hash(config) == utils.calculate_config_hash(config)
+    assert utils.calculate_agent_config_hash({**config, "notes": "local only"}) == utils.calculate_config_hash(config)
+    assert utils.calculate_agent_config_hash({**config, "tags": ["dev"]}) != utils.calculate_config_hash(config)
+
+def test_calculate_file_hash(tmp_path):
+    file_path = tmp_path / "config.json"
+    file_path.write_bytes(b'{"name": "test"}\n')
+    assert utils.calculate_file_hash(str(file_path)) == hashlib.md5(b'{"name": "test"}\n').hexdigest()
+
 def test_calculate_config_hash_empty_dict():
     assert utils.calculate_config_hash({}) == utils.calculate_config_hash({})
 
@@ -63,6 +81,9 @@ LOCK_FILE_TEST_NAME = "test.lock"
 def test_load_lock_file_not_exists(tmp_path):
     lock_data = utils.load_lock_file(str(tmp_path / LOCK_FILE_TEST_NAME))
     assert lock_data == {utils.LOCK_FILE_AGENTS_KEY: {}}
+    # Each default is a fresh dictionary that callers can fill in
+    utils.update_agent_in_lock(lock_data, "agent1", "dev", "id1", "hash1")
+    assert utils.load_lock_file(str(tmp_path / LOCK_FILE_TEST_NAME)) == {utils.LOCK_FILE_AGENTS_KEY: {}}
 
 def test_save_and_load_lock_file(tmp_path):
     lock_data_to_save = {
@@ -78,6 +99,17 @@ def test_save_and_load_lock_file(tmp_path):
     loaded_data = utils.load_lock_file(str(lock_file_path))
     assert loaded_data == lock_data_to_save
 
+def test_save_lock_file_fsyncs_before_replacing(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd))
+    lock_file_path = tmp_path / LOCK_FILE_TEST_NAME
+
+    utils.save_lock_file(str(lock_file_path), {utils.LOCK_FILE_AGENTS_KEY: {}})
+    assert len(synced) == 1
+    # Agent configs are written without an fsync
+    utils.write_agent_config(str(tmp_path / "config.json"), {"name": "agent"})
+    assert len(synced) == 1
+
 def test_load_lock_file_malformed_json(tmp_path):
     # Test case from the issue: malformed JSON should return default structure
     malformed_file = create_temp_file(tmp_path, "malformed.lock", "{this_is_not_json")
@@ -87,6 +119,9 @@ def test_load_lock_file_malformed_json(tmp_path):
     wrong_structure_file = create_temp_file(tmp_path, "wrong_structure.lock", '{"not_agents": {}}')
     lock_data_ws = utils.load_lock_file(str(wrong_structure_file))
     assert lock_data_ws == {utils.LOCK_FILE_AGENTS_KEY: {}}
+    # Valid JSON that is not an object at all
+    list_file = create_temp_file(tmp_path, "list.lock", '["agents"]')
+    assert utils.load_lock_file(str(list_file)) == {utils.LOCK_FILE_AGENTS_KEY: {}}
 
 
 def test_get_agent_from_lock():
@@ -132,6 +167,11 @@ def test_update_agent_in_lock():
     expected_agent2 = {"id": "id_agent2_stage", "hash": "hash_agent2_stage"}
     assert lock_data[utils.LOCK_FILE_AGENTS_KEY]["agent2"]["staging"] == expected_agent2
     
+    # The config file's mtime, size and file hash are recorded when given
+    utils.update_agent_in_lock(lock_data, "agent2", "staging", "id_agent2_stage", "hash_2", mtime_ns=123, file_hash="file_2", size=456)
+    expected_agent2 = {"id": "id_agent2_stage", "hash": "hash_2", "mtime_ns": 123, "size": 456, "file_hash": "file_2"}
+    assert lock_data[utils.LOCK_FILE_AGENTS_KEY]["agent2"]["staging"] == expected_agent2
+    
     # Check overall structure integrity
     assert utils.LOCK_FILE_AGENTS_KEY in lock_data
     assert "agent1" in lock_data[utils.LOCK_FILE_AGENTS_KEY]
@@ -150,3 +190,103 @@ def test_write_agent_config_creates_subdir(tmp_path):
     assert file_path.exists()
     read_data = utils.read_agent_config(str(file_path))
     assert read_data == config_data
+
+    # Nested directories, and the lock file, are created the same way
+    lock_file_path = tmp_path / "a" / "b" / LOCK_FILE_TEST_NAME
+    utils.save_lock_file(str(lock_file_path), {utils.LOCK_FILE_AGENTS_KEY: {}})
+    assert utils.load_lock_file(str(lock_file_path)) == {utils.LOCK_FILE_AGENTS_KEY: {}}
+    assert not list(lock_file_path.parent.glob("*.tmp"))
+
+def test_write_agent_config_skips_identical_content(tmp_path):
+    file_path = tmp_path / "same.json"
+    utils.write_agent_config(str(file_path), {"value": 1})
+    os.utime(file_path, ns=(0, 0))
+
+    utils.write_agent_config(str(file_path), {"value": 1})
+    assert os.stat(file_path).st_mtime_ns == 0
+
+    utils.write_agent_config(str(file_path), {"value": 2})
+    assert utils.read_agent_config(str(file_path)) == {"value": 2}
+    assert not list(tmp_path.glob("*.tmp"))
+
+@pytest.mark.skipif(os.name == "nt", reason="symlinks need extra privileges on Windows")
+def test_write_agent_config_through_symlink_updates_target(tmp_path):
+    target_path = tmp_path / "shared" / "agent.json"
+    utils.write_agent_config(str(target_path), {"value": 1})
+    link_path = tmp_path / "agent_link.json"
+    link_path.symlink_to(target_path)
+
+    utils.write_agent_config(str(link_path), {"value": 2})
+    assert link_path.is_symlink()
+    assert utils.read_agent_config(str(target_path)) == {"value": 2}
+    assert not list(tmp_path.rglob("*.tmp"))
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+def test_write_agent_config_keeps_file_mode(tmp_path):
+    file_path = tmp_path / "private.json"
+    utils.write_agent_config(str(file_path), {"value": 1})
+    # New files get the same mode open() would give them
+    plain_path = tmp_path / "plain.json"
+    plain_path.write_bytes(b"{}")
+    assert file_path.stat().st_mode & 0o777 == plain_path.stat().st_mode & 0o777
+
+    os.chmod(file_path, 0o600)
+    utils.write_agent_config(str(file_path), {"value": 2})
+    assert file_path.stat().st_mode & 0o777 == 0o600
+    assert utils.read_agent_config(str(file_path)) == {"value": 2}
+
+def test_write_agent_config_without_orjson_matches(tmp_path, monkeypatch):
+    config_data = {"name": "agent", "unicode": "你好", "nested": {"items": [1, 2.5, None]}}
+    fast_path = tmp_path / "fast.json"
+    utils.write_agent_config(str(fast_path), config_data)
+
+    monkeypatch.setattr(utils, "orjson", None)
+    fallback_path = tmp_path / "fallback.json"
+    utils.write_agent_config(str(fallback_path), config_data)
+
+    assert fallback_path.read_bytes() == fast_path.read_bytes()
+    assert utils.read_agent_config(str(fallback_path)) == config_data
+
+def test_read_agent_config_cache_returns_independent_copies(tmp_path):
+    file_path = tmp_path / "cached.json"
+    utils.write_agent_config(str(file_path), {"tags": ["a"]})
+
+    first = utils.read_agent_config(str(file_path))
+    first["tags"].append("mutated")
+    second = utils.read_agent_config(str(file_path))
+    assert second == {"tags": ["a"]}
+
+def test_read_agent_config_cache_detects_external_edits(tmp_path):
+    file_path = tmp_path / "edited.json"
+    utils.write_agent_config(str(file_path), {"value": 1})
+    assert utils.read_agent_config(str(file_path)) == {"value": 1}
+
+    # Simulate an editor writing the file directly, bypassing write_agent_config
+    file_path.write_text('{"value": 22}', encoding='utf-8')
+    assert utils.read_agent_config(str(file_path)) == {"value": 22}
+
+def test_read_agent_config_with_hash(tmp_path):
+    config_data = {"name": "agent", "tags": ["dev"]}
+    file_path = tmp_path / "hashed.json"
+    utils.write_agent_config(str(file_path), config_data)
+
+    config, config_hash = utils.read_agent_config_with_hash(str(file_path))
+    assert config == config_data
+    assert config_hash == utils.calculate_agent_config_hash(config_data)
+    # Served from the cache on the second read
+    assert utils.read_agent_config_with_hash(str(file_path)) == (config_data, config_hash)
+
+    utils.write_agent_config(str(file_path), {"name": "agent", "tags": ["prod"]})
+    _, new_hash = utils.read_agent_config_with_hash(str(file_path))
+    assert new_hash != config_hash
+
+def test_read_config_file_with_hash(tmp_path):
+    file_path = tmp_path / "snapshot.json"
+    utils.write_agent_config(str(file_path), {"name": "agent"})
+
+    data, file_hash, mtime_ns, size = utils.read_config_file_with_hash(str(file_path))
+    file_stat = file_path.stat()
+    assert data == file_path.read_bytes()
+    assert file_hash == hashlib.md5(data).hexdigest()
+    assert (mtime_ns, size) == (file_stat.st_mtime_ns, file_stat.st_size)
+    assert utils.parse_agent_config_with_hash(str(file_path), data) == utils.read_agent_config_with_hash(str(file_path))